@@ -1,8 +1,10 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from model.predictor import DrinkPredictor
+from model.shadow import ShadowScorer
 from datetime import datetime
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,25 +12,128 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Initialize predictor
-try:
-    predictor = DrinkPredictor(model_path='model')
-    print("✅ Predictor initialized successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load model - {e}")
-    print("Run 'python model/train_model.py' first to train the model")
-    predictor = None
+# Optional sharded catalog: CATALOG_SHARDS worker processes score slices of
+# the catalog, each given CATALOG_SHARD_TIMEOUT_MS before it is skipped
+CATALOG_SHARDS = int(os.getenv('CATALOG_SHARDS', 0))
+CATALOG_SHARD_TIMEOUT = int(os.getenv('CATALOG_SHARD_TIMEOUT_MS', 200)) / 1000
+
+# Optional shadow model: a candidate DrinkPredictor that re-scores a sampled
+# fraction of live traffic in the background, sharing the primary's catalog
+SHADOW_MODEL_PATH = os.getenv('SHADOW_MODEL_PATH')
+SHADOW_SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', 0.1))
+SHADOW_WORKERS = int(os.getenv('SHADOW_WORKERS', 2))
+
+# Endpoints served before the predictor is warmed up; /retrain stays open so
+# a server started without a trained model can still be recovered
+UNGATED_ENDPOINTS = {'health_check', 'liveness', 'readiness', 'retrain_model', 'static'}
+
+predictor = None
+shadow = None
+startup_state = {
+    'status': 'starting',
+    'error': None,
+    'started_at': datetime.utcnow().isoformat(),
+    'ready_at': None
+}
+
+def load_predictor(catalog=None):
+    """Build the primary predictor and warm up its scoring paths"""
+    from model.catalog_stats import CatalogStats
+    from model.predictor import DrinkPredictor
+    
+    loaded = DrinkPredictor(
+        model_path='model',
+        shards=CATALOG_SHARDS,
+        shard_timeout=CATALOG_SHARD_TIMEOUT,
+        catalog=catalog
+    )
+    
+    # Served as-is by /stats and /catalog until the next load
+    loaded.catalog_stats = CatalogStats(loaded.drinks_df)
+    loaded.warm_up()
+    return loaded
+
+def load_shadow(primary):
+    """Build the shadow scorer on top of the primary predictor's catalog"""
+    if not SHADOW_MODEL_PATH or primary is None:
+        return None
+    try:
+        from model.predictor import DrinkPredictor
+        
+        # The shadow ranks with its own trained model, so load it up front:
+        # a bad SHADOW_MODEL_PATH should fail here, not on a sampled request
+        shadow_predictor = DrinkPredictor(
+            model_path=SHADOW_MODEL_PATH,
+            drinks_df=primary.drinks_df,
+            model_rerank=True
+        )
+        shadow_predictor.load_artifacts()
+        shadow_predictor.warm_up()
+        print(f"✅ Shadow model loaded from {SHADOW_MODEL_PATH} (sampling {SHADOW_SAMPLE_RATE:.0%})")
+        return ShadowScorer(shadow_predictor, sample_rate=SHADOW_SAMPLE_RATE, max_workers=SHADOW_WORKERS)
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load shadow model - {e}")
+        return None
+
+def mark_ready():
+    startup_state.update(status='ready', error=None, ready_at=datetime.utcnow().isoformat())
+
+def startup():
+    """Load and warm up the predictor; readiness flips only once this succeeds"""
+    global predictor, shadow
+    
+    start = time.perf_counter()
+    try:
+        predictor = load_predictor()
+        shadow = load_shadow(predictor)
+        print(f"✅ Predictor initialized and warmed up in {time.perf_counter() - start:.2f}s")
+        mark_ready()
+    except Exception as e:
+        startup_state.update(status='failed', error=str(e))
+        print(f"⚠️  Warning: Could not load model - {e}")
+        print("Run 'python model/train_model.py' first to train the model")
+
+# Load in the background so liveness answers while the model warms up.
+# Shard worker processes import this module as __mp_main__; they must not.
+if __name__ != '__mp_main__':
+    threading.Thread(target=startup, name='startup', daemon=True).start()
+
+@app.before_request
+def require_ready():
+    """Reject traffic until startup has finished warming up"""
+    if request.endpoint in UNGATED_ENDPOINTS or startup_state['status'] == 'ready':
+        return None
+    
+    return jsonify({
+        'success': False,
+        'error': f"Service not ready ({startup_state['status']})",
+        'recommendations': []
+    }), 503
 
 @app.route('/', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
-        'status': 'running',
+        'status': startup_state['status'],
         'model_loaded': predictor is not None,
         'timestamp': datetime.utcnow().isoformat(),
         'version': '1.0.0'
     })
 
+@app.route('/livez', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up and serving"""
+    return jsonify({'status': 'alive'}), 200
+
+@app.route('/readyz', methods=['GET'])
+def readiness():
+    """Readiness probe: the predictor is loaded and warmed up"""
+    ready = startup_state['status'] == 'ready'
+    return jsonify({
+        'ready': ready,
+        **startup_state
+    }), 200 if ready else 503
+
 @app.route('/recommend', methods=['POST'])
 def recommend_drink():
     """
@@ -62,14 +167,23 @@ def recommend_drink():
             }), 500
         
         # Get recommendations
+        start = time.perf_counter()
         result = predictor.predict(user_data)
+        latency_ms = (time.perf_counter() - start) * 1000
         
         if result['success']:
             print(f"\n✅ Returning {len(result.get('recommendations', []))} recommendations:")
             for i, rec in enumerate(result.get('recommendations', [])[:3], 1):
                 print(f"   {i}. {rec['name']} (score: {rec['score']})")
         
-        return jsonify(result), 200
+        response = jsonify(result)
+        
+        # Shadow scoring runs only after the response has gone out
+        if shadow is not None:
+            scorer = shadow
+            response.call_on_close(lambda: scorer.submit(user_data, result, latency_ms))
+        
+        return response, 200
         
     except Exception as e:
         print(f"\n❌ Error processing request: {e}")
@@ -95,9 +209,16 @@ def retrain_model():
         if model.train():
             model.save_model()
             
-            # Reload predictor
-            global predictor
-            predictor = DrinkPredictor(model_path='model')
+            # Reload and warm up the predictor before swapping it in,
+            # re-syncing only the catalog shards that changed
+            global predictor, shadow
+            predictor = load_predictor(catalog=predictor.catalog if predictor is not None else None)
+            mark_ready()
+            
+            # Point the shadow model at the refreshed catalog
+            if shadow is not None:
+                shadow.shutdown()
+            shadow = load_shadow(predictor)
             
             return jsonify({
                 'success': True,
@@ -118,31 +239,53 @@ def retrain_model():
             'error': str(e)
         }), 500
 
+def cached_json_response(cached):
+    """Serve a precomputed JSON payload, answering 304 when the ETag matches"""
+    # If-None-Match uses weak comparison (RFC 9110), so W/"..." from proxies still matches
+    if request.if_none_match.contains_weak(cached.etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(cached.body, mimetype='application/json')
+    response.set_etag(cached.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/stats', methods=['GET'])
 def get_stats():
-    """Get model statistics"""
-    try:
-        if predictor is None:
-            return jsonify({
-                'success': False,
-                'error': 'Model not loaded'
-            }), 500
-        
-        stats = {
-            'success': True,
-            'total_drinks': len(predictor.drinks_df),
-            'categories': predictor.drinks_df['category'].value_counts().to_dict(),
-            'temperatures': predictor.drinks_df['temperature'].value_counts().to_dict(),
-            'caffeine_levels': predictor.drinks_df['caffeineLevel'].value_counts().to_dict()
-        }
-        
-        return jsonify(stats), 200
-        
-    except Exception as e:
+    """Get model statistics (precomputed at model load)"""
+    if predictor is None:
         return jsonify({
             'success': False,
-            'error': str(e)
+            'error': 'Model not loaded'
         }), 500
+    
+    return cached_json_response(predictor.catalog_stats.stats)
+
+@app.route('/catalog', methods=['GET'])
+def get_catalog():
+    """Get a snapshot of the drinks catalog (precomputed at model load)"""
+    if predictor is None:
+        return jsonify({
+            'success': False,
+            'error': 'Model not loaded'
+        }), 500
+    
+    return cached_json_response(predictor.catalog_stats.snapshot)
+
+@app.route('/shadow', methods=['GET'])
+def get_shadow_stats():
+    """Get shadow model comparison statistics"""
+    if shadow is None:
+        return jsonify({
+            'success': False,
+            'error': 'Shadow model not configured'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'model_path': SHADOW_MODEL_PATH,
+        **shadow.stats()
+    }), 200
 
 @app.route('/test', methods=['POST'])
 def test_recommendation():
@@ -183,12 +326,20 @@ if __name__ == '__main__':
     print(f"\n📋 Available Endpoints:")
     print(f"   GET  http://{host}:{port}/")
     print(f"        → Health check")
+    print(f"\n   GET  http://{host}:{port}/livez")
+    print(f"        → Liveness probe")
+    print(f"\n   GET  http://{host}:{port}/readyz")
+    print(f"        → Readiness probe (after warm-up)")
     print(f"\n   POST http://{host}:{port}/recommend")
     print(f"        → Get drink recommendations")
     print(f"\n   POST http://{host}:{port}/retrain")
     print(f"        → Retrain model with latest data")
     print(f"\n   GET  http://{host}:{port}/stats")
     print(f"        → Get model statistics")
+    print(f"\n   GET  http://{host}:{port}/catalog")
+    print(f"        → Get catalog snapshot")
+    print(f"\n   GET  http://{host}:{port}/shadow")
+    print(f"        → Shadow model comparison stats")
     print(f"\n   POST http://{host}:{port}/test")
     print(f"        → Test with sample data")
     print(f"\n{'='*60}\n")
@@ -0,0 +1,69 @@
+"""
+Catalog statistics computed once per model load.
+
+The /stats and /catalog responses are serialized up front and tagged with a
+hash of their bytes, so polling clients can revalidate with If-None-Match
+and get a 304 without anything being recomputed.
+"""
+import hashlib
+import json
+from collections import Counter
+
+
+def _value_counts(drinks_df, column):
+    if column not in drinks_df:
+        return {}
+    return {str(k): int(v) for k, v in drinks_df[column].value_counts().items()}
+
+
+def _list_coverage(drinks_df, column):
+    """How many drinks list each value in a list-valued column"""
+    counts = Counter()
+    if column in drinks_df:
+        for values in drinks_df[column]:
+            if isinstance(values, (list, tuple)):
+                counts.update(str(v) for v in set(values))
+    return dict(counts.most_common())
+
+
+def compute_stats(drinks_df):
+    """Summary statistics for the /stats endpoint"""
+    return {
+        'success': True,
+        'total_drinks': len(drinks_df),
+        'categories': _value_counts(drinks_df, 'category'),
+        'temperatures': _value_counts(drinks_df, 'temperature'),
+        'caffeine_levels': _value_counts(drinks_df, 'caffeineLevel'),
+        'vegan': int(drinks_df['vegan'].fillna(False).astype(bool).sum()) if 'vegan' in drinks_df else 0,
+        'mood_coverage': _list_coverage(drinks_df, 'bestForMoods'),
+        'weather_coverage': _list_coverage(drinks_df, 'bestForWeather'),
+        'time_of_day_coverage': _list_coverage(drinks_df, 'bestTimeOfDay'),
+        'flavor_tags': _list_coverage(drinks_df, 'flavorProfile')
+    }
+
+
+def compute_snapshot(drinks_df):
+    """Full catalog listing for the /catalog endpoint"""
+    # to_json takes care of NaN and numpy scalars
+    drinks = json.loads(drinks_df.to_json(orient='records'))
+    return {
+        'success': True,
+        'total_drinks': len(drinks),
+        'drinks': drinks
+    }
+
+
+class CachedPayload:
+    """A JSON body serialized once, with a strong ETag over its bytes"""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class CatalogStats:
+    """Precomputed /stats and /catalog payloads for one catalog"""
+
+    def __init__(self, drinks_df):
+        self.stats = CachedPayload(compute_stats(drinks_df))
+        self.snapshot = CachedPayload(compute_snapshot(drinks_df))
@@ -0,0 +1,91 @@
+"""
+Offline coordinate lookup: latitude/longitude -> UTC offset and climate zone.
+
+Regions are coarse bounding boxes bundled in geo_regions.json, sorted by
+area with the smallest first, so a small box carved out of a larger one
+(an island, a border strip) wins where they overlap. They are bucketed
+into a grid of GRID_DEGREES cells, so a lookup only tests the handful of
+boxes overlapping its cell. Results are memoized per quantized coordinate,
+making repeat lookups a dict hit.
+Points outside every box fall back to nautical time (longitude / 15) and a
+latitude-band climate. Offsets are standard time; DST is not modelled.
+"""
+import json
+import math
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+REGIONS_FILE = Path(__file__).parent / 'geo_regions.json'
+
+GRID_DEGREES = 5
+
+# ~1 km; finer than the precision of the region boxes
+QUANTIZE_DEGREES = 0.01
+
+GeoInfo = namedtuple('GeoInfo', ['utc_offset', 'climate', 'region'])
+
+_index = None
+
+
+def _cell(latitude, longitude):
+    return (int(math.floor(latitude / GRID_DEGREES)), int(math.floor(longitude / GRID_DEGREES)))
+
+
+def _build_index():
+    """Bucket region boxes into grid cells, keeping table order within a cell"""
+    with open(REGIONS_FILE, encoding='utf-8') as f:
+        regions = json.load(f)
+
+    grid = {}
+    for region in regions:
+        south, west, north, east = region['bounds']
+        south_cell, west_cell = _cell(south, west)
+        north_cell, east_cell = _cell(north, east)
+        for lat_cell in range(south_cell, north_cell + 1):
+            for lon_cell in range(west_cell, east_cell + 1):
+                grid.setdefault((lat_cell, lon_cell), []).append(region)
+    return grid
+
+
+def _fallback(latitude, longitude):
+    abs_lat = abs(latitude)
+    if abs_lat < 23.5:
+        climate = 'tropical'
+    elif abs_lat < 45:
+        climate = 'temperate'
+    elif abs_lat < 60:
+        climate = 'continental'
+    else:
+        climate = 'polar'
+    return GeoInfo(round(longitude / 15), climate, None)
+
+
+@lru_cache(maxsize=4096)
+def _lookup(lat_q, lon_q):
+    global _index
+    if _index is None:
+        _index = _build_index()
+
+    latitude = lat_q * QUANTIZE_DEGREES
+    longitude = lon_q * QUANTIZE_DEGREES
+    for region in _index.get(_cell(latitude, longitude), ()):
+        south, west, north, east = region['bounds']
+        if south <= latitude <= north and west <= longitude <= east:
+            return GeoInfo(region['utc_offset'], region['climate'], region['name'])
+    return _fallback(latitude, longitude)
+
+
+def resolve_location(location):
+    """Resolve a request's location block to GeoInfo, or None if it has no usable coordinates"""
+    if not isinstance(location, dict):
+        return None
+    try:
+        latitude = float(location['latitude'])
+        longitude = float(location['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+
+    return _lookup(round(latitude / QUANTIZE_DEGREES), round(longitude / QUANTIZE_DEGREES))
@@ -1,159 +1,215 @@
-import joblib
 import pandas as pd
-import numpy as np
-import os
+
+from model.scoring import (
+    build_context,
+    format_recommendation,
+    generate_reasons,
+    get_time_of_day,
+    map_weather_condition,
+    rank_key,
+    score_drink,
+)
+
+# Trained estimators are only unpickled on first use; scoring doesn't need
+# them, so startup never pays for importing sklearn
+ARTIFACTS = (
+    'model',
+    'mood_encoder',
+    'weather_encoder',
+    'caffeine_encoder',
+    'temperature_encoder',
+    'label_encoder',
+)
+
+# Built from the encoders in load_artifacts() and loaded lazily with them
+DERIVED_ARTIFACTS = ('encoder_codes', 'model_columns')
+
+# Must match the feature order the model was trained on in train_model.py
+FEATURE_COLUMNS = ['mood_encoded', 'weather_encoded', 'caffeine_encoded',
+                   'temp_encoded', 'sweetnessLevel', 'intensity', 'vegan']
+
+# With model_rerank, the rule-based top MODEL_RERANK_POOL candidates get up to
+# MODEL_RERANK_WEIGHT extra points from the trained model's probability
+MODEL_RERANK_POOL = 20
+MODEL_RERANK_WEIGHT = 50
+
+# One request per scoring path: cold drinks + energy boost + location lookup,
+# hot drinks + calm without location
+WARM_UP_REQUESTS = [
+    {
+        'mood': 'Energetic',
+        'song': 'Warm-up',
+        'location': {'latitude': 30.0444, 'longitude': 31.2357},
+        'weather': {'temperature': 30, 'condition': 'sunny'},
+        'timestamp': '2024-01-01T09:00:00Z'
+    },
+    {
+        'mood': 'Calm',
+        'song': None,
+        'weather': {'temperature': 5, 'condition': 'rainy'},
+        'timestamp': '2024-01-01T22:00:00Z'
+    },
+]
 
 class DrinkPredictor:
-    def __init__(self, model_path='model'):
-        """Load the trained model and encoders"""
-        self.model = joblib.load(f'{model_path}/model.pkl')
-        self.mood_encoder = joblib.load(f'{model_path}/mood_encoder.pkl')
-        self.weather_encoder = joblib.load(f'{model_path}/weather_encoder.pkl')
-        self.caffeine_encoder = joblib.load(f'{model_path}/caffeine_encoder.pkl')
-        self.temperature_encoder = joblib.load(f'{model_path}/temperature_encoder.pkl')
-        self.label_encoder = joblib.load(f'{model_path}/label_encoder.pkl')
-        self.drinks_df = pd.read_pickle(f'{model_path}/drinks_df.pkl')
+    def __init__(self, model_path='model', shards=0, shard_timeout=0.2, catalog=None, drinks_df=None,
+                 model_rerank=False):
+        """
+        Load the drinks catalog; the trained model and encoders load lazily.
+        With shards > 0 the catalog is scored by that many worker processes;
+        passing an existing `catalog` re-syncs it instead of starting new workers.
+        Passing `drinks_df` reuses another predictor's catalog instead of loading a copy.
+        With model_rerank the rule-based candidates are re-ranked by the trained model.
+        """
+        self.model_path = model_path
+        self.model_rerank = model_rerank
+        self.drinks_df = drinks_df if drinks_df is not None else pd.read_pickle(f'{model_path}/drinks_df.pkl')
         
         print(f"✅ Model loaded successfully with {len(self.drinks_df)} drinks")
+        
+        self.catalog = catalog
+        if self.catalog is not None:
+            self.catalog.sync(self.drinks_df)
+        elif shards > 0:
+            from model.sharding import ShardedCatalog
+            self.catalog = ShardedCatalog(self.drinks_df, shards, timeout=shard_timeout)
+    
+    def __getattr__(self, name):
+        """Load the trained artifacts the first time one of them is accessed"""
+        if name not in ARTIFACTS + DERIVED_ARTIFACTS:
+            raise AttributeError(name)
+        
+        self.load_artifacts()
+        return self.__dict__[name]
+    
+    def load_artifacts(self):
+        """Unpickle the trained model and encoders now (raises if any are missing)"""
+        import joblib
+        
+        for artifact in ARTIFACTS:
+            setattr(self, artifact, joblib.load(f'{self.model_path}/{artifact}.pkl'))
+        
+        # Class -> code lookups for re-ranking, built once instead of per request
+        self.encoder_codes = {
+            name: dict(zip(encoder.classes_, range(len(encoder.classes_))))
+            for name, encoder in [
+                ('mood', self.mood_encoder),
+                ('weather', self.weather_encoder),
+                ('caffeine', self.caffeine_encoder),
+                ('temperature', self.temperature_encoder),
+                ('label', self.label_encoder)
+            ]
+        }
+        self.model_columns = {label: i for i, label in enumerate(self.model.classes_)}
     
-    def map_weather_condition(self, condition, temperature):
+    def warm_up(self):
+        """Run each scoring path once so the first real request isn't the slow one"""
+        if self.catalog is not None:
+            self.catalog.wait_ready(build_context(WARM_UP_REQUESTS[0]))
+        
+        for user_data in WARM_UP_REQUESTS:
+            result = self.predict(user_data)
+            if not result['success']:
+                raise RuntimeError(f"Warm-up failed: {result['error']}")
+            if result.get('partial'):
+                print(f"⚠️  Warm-up missed shards {result['missing_shards']}")
+    
+    def map_weather_condition(self, condition, temperature, climate=None):
         """Map weather condition to drink-friendly format"""
-        condition = condition.lower() if condition else ""
+        return map_weather_condition(condition, temperature, climate)
+    
+    def get_time_of_day(self, timestamp, utc_offset=None):
+        """Extract local time of day from timestamp"""
+        return get_time_of_day(timestamp, utc_offset)
+    
+    def _top_k(self, context, k):
+        """Score the in-process catalog and return the top-k recommendations"""
+        # Filter drinks by temperature and time
+        filtered_drinks = self.drinks_df[
+            (self.drinks_df['temperature'] == context['preferred_temp']) |
+            (self.drinks_df['temperature'] == 'frozen')
+        ]
+        
+        # Score each filtered drink
+        recommendations = [
+            (score_drink(drink, context), position, drink)
+            for position, (_, drink) in enumerate(filtered_drinks.iterrows())
+        ]
         
-        if temperature >= 25:
-            return "hot"
-        elif temperature >= 18:
-            return "warm"
-        elif temperature >= 10:
-            return "cool"
-        else:
-            return "cold"
+        # Sort by score and get top k
+        recommendations.sort(key=rank_key, reverse=True)
+        return [
+            format_recommendation(drink.to_dict(), score, generate_reasons(drink, context))
+            for score, _, drink in recommendations[:k]
+        ]
     
-    def get_time_of_day(self, timestamp):
-        """Extract time of day from timestamp"""
-        from datetime import datetime
+    def _rerank(self, context, recommendations, k):
+        """Add the trained model's probability for each candidate to its score"""
+        codes = self.encoder_codes
+        mood_code = codes['mood'].get(context['mood'])
+        weather_code = codes['weather'].get(context['weather'])
+        if mood_code is None or weather_code is None:
+            return recommendations[:k]
         
-        try:
-            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            hour = dt.hour
-            
-            if 5 <= hour < 12:
-                return "morning"
-            elif 12 <= hour < 17:
-                return "afternoon"
-            elif 17 <= hour < 21:
-                return "evening"
-            else:
-                return "night"
-        except:
-            return "afternoon"  # default
+        # Candidates whose attributes the model never saw keep their rule score
+        rows, known = [], []
+        for rec in recommendations:
+            caffeine_code = codes['caffeine'].get(rec['caffeineLevel'])
+            temp_code = codes['temperature'].get(rec['temperature'])
+            if caffeine_code is None or temp_code is None or rec['name'] not in codes['label']:
+                continue
+            rows.append([mood_code, weather_code, caffeine_code, temp_code,
+                         rec['sweetnessLevel'], rec['intensity'], int(bool(rec['vegan']))])
+            known.append(rec)
+        
+        if rows:
+            probabilities = self.model.predict_proba(pd.DataFrame(rows, columns=FEATURE_COLUMNS))
+            for rec, row in zip(known, probabilities):
+                column = self.model_columns.get(codes['label'][rec['name']])
+                if column is not None:
+                    rec['score'] += round(MODEL_RERANK_WEIGHT * row[column])
+        
+        recommendations.sort(key=lambda rec: rec['score'], reverse=True)
+        return recommendations[:k]
     
     def predict(self, user_data):
         """Predict drink recommendations based on user data"""
         try:
-            # Extract features
-            mood = user_data.get('mood', 'Happy')
-            weather_temp = user_data.get('weather', {}).get('temperature', 20)
-            weather_condition = user_data.get('weather', {}).get('condition', 'clear')
-            timestamp = user_data.get('timestamp', '')
-            song = user_data.get('song')
-            
-            # Map weather
-            weather = self.map_weather_condition(weather_condition, weather_temp)
-            time_of_day = self.get_time_of_day(timestamp)
+            context = build_context(user_data)
+            k = MODEL_RERANK_POOL if self.model_rerank else 5
             
-            # Determine temperature preference (hot/cold drinks)
-            if weather in ['hot', 'warm']:
-                preferred_temp = 'cold'
-            else:
-                preferred_temp = 'hot'
-            
-            # Filter drinks by temperature and time
-            filtered_drinks = self.drinks_df[
-                (self.drinks_df['temperature'] == preferred_temp) |
-                (self.drinks_df['temperature'] == 'frozen')
-            ].copy()
-            
-            # If song is provided, adjust for energy level
-            energy_boost = 'energetic' in mood.lower() or (song is not None)
-            
-            # Score each filtered drink
-            recommendations = []
-            
-            for _, drink in filtered_drinks.iterrows():
-                score = 0
-                
-                # Mood match (highest weight)
-                best_moods = drink.get('bestForMoods', [])
-                mood_lower = mood.lower()
-                
-                if mood_lower in best_moods:
-                    score += 50
-                elif any(m in best_moods for m in [mood_lower, 'happy', 'refreshed']):
-                    score += 30
-                
-                # Weather match
-                best_weather = drink.get('bestForWeather', [])
-                if weather in best_weather or 'any' in best_weather:
-                    score += 20
-                
-                # Time of day match
-                best_times = drink.get('bestTimeOfDay', [])
-                if best_times and time_of_day in best_times:
-                    score += 15
-                
-                # Energy/caffeine match
-                caffeine = drink.get('caffeineLevel', 'none')
-                if energy_boost and caffeine in ['high', 'medium']:
-                    score += 15
-                elif not energy_boost and caffeine in ['low', 'none']:
-                    score += 10
-                
-                # Temperature match bonus
-                if drink['temperature'] == preferred_temp:
-                    score += 10
+            if self.catalog is not None:
+                top_recommendations, missing_shards = self.catalog.top_k(context, k)
                 
-                # Song bonus (if song selected, prefer more energetic drinks)
-                if song and drink.get('intensity', 0) >= 3:
-                    score += 10
-                
-                recommendations.append({
-                    'drink': drink.to_dict(),
-                    'score': score,
-                    'reasons': self._generate_reasons(drink, mood, weather, time_of_day, song)
-                })
+                # Every shard failed: score in-process rather than return nothing
+                if len(missing_shards) == self.catalog.num_shards:
+                    top_recommendations = self._top_k(context, k)
+            else:
+                top_recommendations, missing_shards = self._top_k(context, k), None
             
-            # Sort by score and get top 5
-            recommendations.sort(key=lambda x: x['score'], reverse=True)
-            top_recommendations = recommendations[:5]
+            if self.model_rerank:
+                top_recommendations = self._rerank(context, top_recommendations, 5)
             
-            return {
+            result = {
                 'success': True,
-                'recommendations': [
-                    {
-                        'name': rec['drink']['name'],
-                        'nameArabic': rec['drink'].get('nameArabic', ''),
-                        'category': rec['drink'].get('category', ''),
-                        'temperature': rec['drink'].get('temperature', ''),
-                        'caffeineLevel': rec['drink'].get('caffeineLevel', ''),
-                        'sweetnessLevel': rec['drink'].get('sweetnessLevel', 0),
-                        'score': rec['score'],
-                        'reasons': rec['reasons'],
-                        'flavorProfile': rec['drink'].get('flavorProfile', []),
-                        'vegan': rec['drink'].get('vegan', False),
-                        'intensity': rec['drink'].get('intensity', 3)
-                    }
-                    for rec in top_recommendations
-                ],
+                'recommendations': top_recommendations,
                 'context': {
-                    'mood': mood,
-                    'weather': weather,
-                    'temperature': weather_temp,
-                    'time_of_day': time_of_day,
-                    'has_song': song is not None
+                    'mood': context['mood'],
+                    'weather': context['weather'],
+                    'temperature': context['temperature'],
+                    'time_of_day': context['time_of_day'],
+                    'utc_offset': context['utc_offset'],
+                    'climate': context['climate'],
+                    'has_song': context['song'] is not None
                 }
             }
             
+            if missing_shards is not None:
+                result['partial'] = 0 < len(missing_shards) < self.catalog.num_shards
+                result['missing_shards'] = missing_shards
+            
+            return result
+            
         except Exception as e:
             return {
                 'success': False,
@@ -163,28 +219,9 @@ class DrinkPredictor:
     
     def _generate_reasons(self, drink, mood, weather, time_of_day, song):
         """Generate human-readable reasons for recommendation"""
-        reasons = []
-        
-        # Mood reason
-        best_moods = drink.get('bestForMoods', [])
-        if mood.lower() in best_moods:
-            reasons.append(f"Perfect for your {mood.lower()} mood")
-        
-        # Weather reason
-        if weather in drink.get('bestForWeather', []):
-            reasons.append(f"Great for {weather} weather")
-        
-        # Time reason
-        if time_of_day in drink.get('bestTimeOfDay', []):
-            reasons.append(f"Ideal for {time_of_day}")
-        
-        # Song reason
-        if song:
-            reasons.append("Matches your music energy")
-        
-        # Flavor reason
-        flavors = drink.get('flavorProfile', [])
-        if flavors:
-            reasons.append(f"Features {', '.join(flavors[:2])} notes")
-        
-        return reasons[:3]  # Return top 3 reasons
\ No newline at end of file
+        return generate_reasons(drink, {
+            'mood': mood,
+            'weather': weather,
+            'time_of_day': time_of_day,
+            'song': song
+        })
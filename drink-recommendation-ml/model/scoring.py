@@ -0,0 +1,202 @@
+"""
+Context extraction and per-drink scoring rules.
+
+Kept free of pandas/sklearn imports so catalog shard workers can score
+plain drink dicts without loading the full model.
+"""
+from datetime import datetime, timedelta, timezone
+
+from model.geo import resolve_location
+
+# People acclimatise: shift the weather buckets (in °C) by local climate
+CLIMATE_TEMPERATURE_SHIFT = {
+    'tropical': 3,
+    'arid': 3,
+    'temperate': 0,
+    'continental': -3,
+    'polar': -5
+}
+
+
+def map_weather_condition(condition, temperature, climate=None):
+    """Map weather condition to drink-friendly format"""
+    condition = condition.lower() if condition else ""
+    shift = CLIMATE_TEMPERATURE_SHIFT.get(climate, 0)
+
+    if temperature >= 25 + shift:
+        return "hot"
+    elif temperature >= 18 + shift:
+        return "warm"
+    elif temperature >= 10 + shift:
+        return "cool"
+    else:
+        return "cold"
+
+
+def local_datetime(timestamp, utc_offset=None):
+    """
+    Parse an ISO timestamp and move it to the given UTC offset (hours).
+    Timestamps that already carry a non-UTC offset are the client's local
+    time and are left alone; naive ones are taken as UTC.
+    """
+    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if utc_offset is None:
+        return dt
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    elif dt.utcoffset() != timedelta(0):
+        return dt
+    return dt.astimezone(timezone(timedelta(hours=utc_offset)))
+
+
+def get_time_of_day(timestamp, utc_offset=None):
+    """Extract local time of day from timestamp"""
+    try:
+        hour = local_datetime(timestamp, utc_offset).hour
+
+        if 5 <= hour < 12:
+            return "morning"
+        elif 12 <= hour < 17:
+            return "afternoon"
+        elif 17 <= hour < 21:
+            return "evening"
+        else:
+            return "night"
+    except:
+        return "afternoon"  # default
+
+
+def build_context(user_data):
+    """Turn a raw request payload into the scoring context"""
+    mood = user_data.get('mood', 'Happy')
+    weather_temp = user_data.get('weather', {}).get('temperature', 20)
+    weather_condition = user_data.get('weather', {}).get('condition', 'clear')
+    timestamp = user_data.get('timestamp', '')
+    song = user_data.get('song')
+
+    # Resolve coordinates to local UTC offset and climate (offline lookup)
+    geo = resolve_location(user_data.get('location'))
+    utc_offset = geo.utc_offset if geo else None
+    climate = geo.climate if geo else None
+
+    # Map weather
+    weather = map_weather_condition(weather_condition, weather_temp, climate)
+    time_of_day = get_time_of_day(timestamp, utc_offset)
+
+    # Determine temperature preference (hot/cold drinks)
+    if weather in ['hot', 'warm']:
+        preferred_temp = 'cold'
+    else:
+        preferred_temp = 'hot'
+
+    return {
+        'mood': mood,
+        'weather': weather,
+        'temperature': weather_temp,
+        'time_of_day': time_of_day,
+        'utc_offset': utc_offset,
+        'climate': climate,
+        'song': song,
+        'preferred_temp': preferred_temp,
+        # If song is provided, adjust for energy level
+        'energy_boost': 'energetic' in mood.lower() or (song is not None),
+    }
+
+
+def is_candidate(drink, context):
+    """Only drinks served at the preferred temperature (or frozen) are scored"""
+    return drink.get('temperature') in (context['preferred_temp'], 'frozen')
+
+
+def score_drink(drink, context):
+    """Score a single drink against the context"""
+    score = 0
+
+    # Mood match (highest weight)
+    best_moods = drink.get('bestForMoods', [])
+    mood_lower = context['mood'].lower()
+
+    if mood_lower in best_moods:
+        score += 50
+    elif any(m in best_moods for m in [mood_lower, 'happy', 'refreshed']):
+        score += 30
+
+    # Weather match
+    best_weather = drink.get('bestForWeather', [])
+    if context['weather'] in best_weather or 'any' in best_weather:
+        score += 20
+
+    # Time of day match
+    best_times = drink.get('bestTimeOfDay', [])
+    if best_times and context['time_of_day'] in best_times:
+        score += 15
+
+    # Energy/caffeine match
+    caffeine = drink.get('caffeineLevel', 'none')
+    if context['energy_boost'] and caffeine in ['high', 'medium']:
+        score += 15
+    elif not context['energy_boost'] and caffeine in ['low', 'none']:
+        score += 10
+
+    # Temperature match bonus
+    if drink['temperature'] == context['preferred_temp']:
+        score += 10
+
+    # Song bonus (if song selected, prefer more energetic drinks)
+    if context['song'] and drink.get('intensity', 0) >= 3:
+        score += 10
+
+    return score
+
+
+def generate_reasons(drink, context):
+    """Generate human-readable reasons for recommendation"""
+    reasons = []
+    mood = context['mood']
+
+    # Mood reason
+    best_moods = drink.get('bestForMoods', [])
+    if mood.lower() in best_moods:
+        reasons.append(f"Perfect for your {mood.lower()} mood")
+
+    # Weather reason
+    if context['weather'] in drink.get('bestForWeather', []):
+        reasons.append(f"Great for {context['weather']} weather")
+
+    # Time reason
+    if context['time_of_day'] in drink.get('bestTimeOfDay', []):
+        reasons.append(f"Ideal for {context['time_of_day']}")
+
+    # Song reason
+    if context['song']:
+        reasons.append("Matches your music energy")
+
+    # Flavor reason
+    flavors = drink.get('flavorProfile', [])
+    if flavors:
+        reasons.append(f"Features {', '.join(flavors[:2])} notes")
+
+    return reasons[:3]  # Return top 3 reasons
+
+
+def format_recommendation(drink, score, reasons):
+    """Shape a scored drink the way the API returns it"""
+    return {
+        'name': drink['name'],
+        'nameArabic': drink.get('nameArabic', ''),
+        'category': drink.get('category', ''),
+        'temperature': drink.get('temperature', ''),
+        'caffeineLevel': drink.get('caffeineLevel', ''),
+        'sweetnessLevel': drink.get('sweetnessLevel', 0),
+        'score': score,
+        'reasons': reasons,
+        'flavorProfile': drink.get('flavorProfile', []),
+        'vegan': drink.get('vegan', False),
+        'intensity': drink.get('intensity', 3)
+    }
+
+
+def rank_key(item):
+    """Sort key for (score, position, ...) tuples: best score, then catalog order"""
+    return (item[0], -item[1])
@@ -0,0 +1,119 @@
+"""
+Shadow scoring of a candidate model against live traffic.
+
+A sampled fraction of live requests is re-scored by the shadow predictor on
+a small background thread pool once the primary response has been sent.
+The pool is bounded: when every slot is busy the sample is dropped rather
+than queued, so shadow work never backs up behind (or slows down) the
+primary path.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def rank_overlap(primary, shadow):
+    """Fraction of the primary top-k names that the shadow also returned"""
+    primary_names = [rec['name'] for rec in primary]
+    shadow_names = {rec['name'] for rec in shadow}
+    if not primary_names:
+        return 1.0 if not shadow_names else 0.0
+    return sum(1 for name in primary_names if name in shadow_names) / len(primary_names)
+
+
+class ShadowScorer:
+    """Re-scores sampled requests with a candidate predictor in the background"""
+
+    def __init__(self, predictor, sample_rate=0.1, max_workers=2, max_pending=None, history=100):
+        self.predictor = predictor
+        self.sample_rate = sample_rate
+        self.max_workers = max_workers
+
+        # Running jobs plus a small waiting room; anything beyond is dropped
+        self._slots = threading.BoundedSemaphore(max_pending or max_workers * 2)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=history)
+        self._counts = {
+            'sampled': 0,
+            'dropped': 0,
+            'completed': 0,
+            'errors': 0
+        }
+        self._overlap_total = 0.0
+        self._top1_matches = 0
+        self._latency_delta_total = 0.0
+
+    def submit(self, user_data, primary_result, primary_latency_ms):
+        """Maybe schedule a shadow comparison; never blocks the caller"""
+        if not primary_result.get('success') or random.random() >= self.sample_rate:
+            return False
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counts['dropped'] += 1
+            return False
+
+        with self._lock:
+            self._counts['sampled'] += 1
+        try:
+            future = self._pool.submit(
+                self._compare,
+                user_data,
+                primary_result['recommendations'],
+                primary_latency_ms
+            )
+        except RuntimeError:
+            # Pool already shut down
+            self._slots.release()
+            return False
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _compare(self, user_data, primary_recs, primary_latency_ms):
+        start = time.perf_counter()
+        result = self.predictor.predict(user_data)
+        shadow_latency_ms = (time.perf_counter() - start) * 1000
+
+        if not result.get('success'):
+            with self._lock:
+                self._counts['errors'] += 1
+            return
+
+        shadow_recs = result['recommendations']
+        overlap = rank_overlap(primary_recs, shadow_recs)
+        top1_match = bool(primary_recs and shadow_recs) and primary_recs[0]['name'] == shadow_recs[0]['name']
+        latency_delta_ms = shadow_latency_ms - primary_latency_ms
+
+        with self._lock:
+            self._counts['completed'] += 1
+            self._overlap_total += overlap
+            self._top1_matches += int(top1_match)
+            self._latency_delta_total += latency_delta_ms
+            self._recent.append({
+                'mood': user_data.get('mood'),
+                'rank_overlap': round(overlap, 3),
+                'top1_match': top1_match,
+                'primary_latency_ms': round(primary_latency_ms, 2),
+                'shadow_latency_ms': round(shadow_latency_ms, 2),
+                'latency_delta_ms': round(latency_delta_ms, 2)
+            })
+
+    def stats(self):
+        """Aggregate comparison stats for the /shadow endpoint"""
+        with self._lock:
+            completed = self._counts['completed']
+            return {
+                'sample_rate': self.sample_rate,
+                'max_workers': self.max_workers,
+                **self._counts,
+                'mean_rank_overlap': round(self._overlap_total / completed, 3) if completed else None,
+                'top1_match_rate': round(self._top1_matches / completed, 3) if completed else None,
+                'mean_latency_delta_ms': round(self._latency_delta_total / completed, 2) if completed else None,
+                'recent': list(self._recent)
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
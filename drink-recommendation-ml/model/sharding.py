@@ -0,0 +1,322 @@
+"""
+Sharded catalog: the drinks catalog partitioned across local worker processes.
+
+Each shard worker holds its slice of the catalog as plain dicts and computes
+a local top-k for a scoring context. The coordinator scatters the context to
+every shard, gathers replies until a shared deadline and merges the sorted
+per-shard lists with a heap. Shards that miss the deadline are reported back
+so the caller can flag the response as partial.
+
+Drinks are assigned to shards by a stable hash of their name, so a catalog
+sync only rebuilds the shards whose contents actually changed. Positions in
+the full catalog (the tie-break) are not part of a shard's fingerprint: an
+insert or delete elsewhere only ships the shifted positions. The coordinator
+keeps each shard's records, so a worker that dies is restarted on the next
+query.
+
+Workers come from a forkserver rather than a plain fork: the coordinator
+starts them from request and startup threads, and forking a multi-threaded
+process can deadlock the child.
+"""
+import atexit
+import hashlib
+import heapq
+import itertools
+import multiprocessing as mp
+import pickle
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from itertools import islice
+
+from model.scoring import (
+    format_recommendation,
+    generate_reasons,
+    is_candidate,
+    rank_key,
+    score_drink,
+)
+
+_mp = mp.get_context('forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn')
+if _mp.get_start_method() == 'forkserver':
+    # The server imports __main__ once so forked workers don't re-run it;
+    # preloading this module keeps worker start-up to a bare fork
+    _mp.set_forkserver_preload(['__main__', 'model.sharding'])
+
+
+def shard_for(name, num_shards):
+    """Stable shard assignment for a drink name"""
+    return zlib.crc32(str(name).encode('utf-8')) % num_shards
+
+
+def partition_catalog(drinks_df, num_shards):
+    """Split the catalog into per-shard lists of (position, drink) pairs"""
+    partitions = [[] for _ in range(num_shards)]
+    for position, drink in enumerate(drinks_df.to_dict('records')):
+        partitions[shard_for(drink.get('name'), num_shards)].append((position, drink))
+    return partitions
+
+
+def local_top_k(records, context, k):
+    """Top-k (score, position, recommendation) tuples for one shard, best first"""
+    scored = [
+        (score_drink(drink, context), position, drink)
+        for position, drink in records
+        if is_candidate(drink, context)
+    ]
+    return [
+        (score, position, format_recommendation(drink, score, generate_reasons(drink, context)))
+        for score, position, drink in heapq.nlargest(k, scored, key=rank_key)
+    ]
+
+
+def _fingerprint(records):
+    """Hash of a shard's drinks, ignoring their catalog positions"""
+    return hashlib.sha1(pickle.dumps([drink for _, drink in records])).hexdigest()
+
+
+def _positions(records):
+    return [position for position, _ in records]
+
+
+def _shard_worker(conn, records):
+    """Worker process loop: answer queries and swap in rebuilt records"""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+
+        kind = message[0]
+        if kind == 'query':
+            _, request_id, context, k = message
+            try:
+                conn.send((request_id, local_top_k(records, context, k), None))
+            except Exception as e:
+                conn.send((request_id, [], str(e)))
+        elif kind == 'rebuild':
+            records = message[1]
+        elif kind == 'reposition':
+            records = list(zip(message[1], (drink for _, drink in records)))
+        elif kind == 'stop':
+            break
+
+    conn.close()
+
+
+class CatalogShard:
+    """Coordinator-side handle for one shard worker process"""
+
+    def __init__(self, shard_id, records):
+        self.shard_id = shard_id
+        self._send_lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._process = None
+        self._channel = None
+        self._start(records)
+
+    def _set_records(self, records):
+        self.records = records
+        self.fingerprint = _fingerprint(records)
+        self.positions = _positions(records)
+        self.size = len(records)
+
+    def _start(self, records):
+        self._set_records(records)
+
+        parent_conn, child_conn = _mp.Pipe()
+        self._process = _mp.Process(
+            target=_shard_worker,
+            args=(child_conn, records),
+            name=f'catalog-shard-{self.shard_id}',
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+
+        # Each worker gets its own pending map, so the reader of a dead
+        # worker only fails requests that were sent to that worker
+        pending = {}
+        self._channel = (parent_conn, pending)
+
+        reader = threading.Thread(
+            target=self._read_replies,
+            args=(parent_conn, pending),
+            name=f'catalog-shard-{self.shard_id}-reader',
+            daemon=True
+        )
+        reader.start()
+
+    def _read_replies(self, conn, pending):
+        """Resolve pending futures as replies arrive; late replies are dropped"""
+        while True:
+            try:
+                request_id, results, error = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._pending_lock:
+                future = pending.pop(request_id, None)
+            if future is None:
+                continue
+            if error:
+                future.set_exception(RuntimeError(f'shard {self.shard_id}: {error}'))
+            else:
+                future.set_result(results)
+        conn.close()
+
+        # Worker is gone; fail anything still waiting on it
+        with self._pending_lock:
+            orphaned = list(pending.values())
+            pending.clear()
+        for future in orphaned:
+            future.set_exception(RuntimeError(f'shard {self.shard_id} worker exited'))
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def submit(self, request_id, context, k):
+        """Send a query to the worker and return a Future for its reply"""
+        future = Future()
+        conn, pending = self._channel
+        with self._pending_lock:
+            pending[request_id] = future
+        try:
+            with self._send_lock:
+                conn.send(('query', request_id, context, k))
+        except (OSError, ValueError) as e:
+            with self._pending_lock:
+                pending.pop(request_id, None)
+            future.set_exception(RuntimeError(f'shard {self.shard_id}: {e}'))
+        return future
+
+    def ensure_alive(self):
+        """Restart the worker from the coordinator's copy of its records if it died"""
+        if self.alive:
+            return
+        with self._restart_lock:
+            if not self.alive:
+                print(f"⚠️  Shard {self.shard_id} worker died, restarting")
+                self.rebuild(self.records)
+
+    def cancel(self, request_id):
+        _, pending = self._channel
+        with self._pending_lock:
+            pending.pop(request_id, None)
+
+    def _restart(self, records):
+        self.stop()
+        self._start(records)
+
+    def rebuild(self, records):
+        """Replace this shard's records, restarting the worker if it died"""
+        if not self.alive:
+            self._restart(records)
+            return
+
+        conn, _ = self._channel
+        try:
+            with self._send_lock:
+                conn.send(('rebuild', records))
+        except (OSError, ValueError):
+            # The worker died after the liveness check and its pipe is closed
+            self._restart(records)
+            return
+        self._set_records(records)
+
+    def reposition(self, records):
+        """Ship new catalog positions for unchanged drinks (cheaper than a rebuild)"""
+        conn, _ = self._channel
+        try:
+            with self._send_lock:
+                conn.send(('reposition', _positions(records)))
+        except (OSError, ValueError):
+            self._restart(records)
+            return
+        self.records = records
+        self.positions = _positions(records)
+
+    def stop(self, timeout=1.0):
+        if self._channel is not None:
+            conn, _ = self._channel
+            try:
+                with self._send_lock:
+                    conn.send(('stop',))
+            except (OSError, ValueError):
+                pass
+        # The reader thread closes the pipe once the worker's end goes away
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+
+
+class ShardedCatalog:
+    """Drinks catalog spread across shard worker processes"""
+
+    def __init__(self, drinks_df, num_shards, timeout=0.2):
+        if num_shards < 1:
+            raise ValueError('num_shards must be at least 1')
+
+        self.num_shards = num_shards
+        self.timeout = timeout
+        self._request_ids = itertools.count()
+        self.shards = [
+            CatalogShard(shard_id, records)
+            for shard_id, records in enumerate(partition_catalog(drinks_df, num_shards))
+        ]
+        atexit.register(self.close)
+
+        print(f"✅ Catalog split across {num_shards} shards: {[s.size for s in self.shards]}")
+
+    def top_k(self, context, k=5, timeout=None):
+        """
+        Scatter the context to every shard and merge the replies.
+        Returns (recommendations, missing_shard_ids).
+        """
+        for shard in self.shards:
+            shard.ensure_alive()
+
+        request_id = next(self._request_ids)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        futures = [(shard, shard.submit(request_id, context, k)) for shard in self.shards]
+
+        shard_results = []
+        missing = []
+        for shard, future in futures:
+            try:
+                shard_results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except Exception as e:
+                # Timed out, worker died or scoring failed: serve what we have
+                shard.cancel(request_id)
+                missing.append(shard.shard_id)
+                print(f"⚠️  Shard {shard.shard_id} skipped: {str(e) or 'timed out'}")
+
+        merged = heapq.merge(*shard_results, key=rank_key, reverse=True)
+        return [rec for _, _, rec in islice(merged, k)], missing
+
+    def wait_ready(self, context, timeout=10.0):
+        """Block until every worker answers once (first start pays for the forkserver)"""
+        _, missing = self.top_k(context, 1, timeout=timeout)
+        if missing:
+            raise RuntimeError(f'Catalog shards {missing} did not start')
+
+    def sync(self, drinks_df):
+        """Rebuild only the shards whose contents changed; returns their ids"""
+        rebuilt = []
+        for shard, records in zip(self.shards, partition_catalog(drinks_df, self.num_shards)):
+            if shard.fingerprint != _fingerprint(records) or not shard.alive:
+                shard.rebuild(records)
+                rebuilt.append(shard.shard_id)
+            elif shard.positions != _positions(records):
+                shard.reposition(records)
+
+        print(f"🔄 Catalog sync rebuilt shards: {rebuilt or 'none'}")
+        return rebuilt
+
+    def close(self):
+        for shard in self.shards:
+            shard.stop()
@@ -83,12 +83,13 @@ class DrinkRecommendationModel:
         print(f"📊 Created {len(df)} training samples from {len(drinks)} drinks")
         return df
     
-    def train(self):
-        """Train the recommendation model"""
+    def train(self, drinks=None):
+        """Train the recommendation model (on `drinks` if given, else fetched from Convex)"""
         print("🚀 Starting model training...")
         
         # Fetch drinks from Convex
-        drinks = self.fetch_drinks_from_convex()
+        if drinks is None:
+            drinks = self.fetch_drinks_from_convex()
         if not drinks:
             print("❌ No drinks data available for training")
             return False
@@ -125,7 +126,7 @@ class DrinkRecommendationModel:
         training_df['temp_encoded'] = self.temperature_encoder.fit_transform(training_df['temperature'])
         training_df['drink_encoded'] = self.label_encoder.fit_transform(training_df['drink_name'])
         
-        # Prepare features and labels
+        # Prepare features and labels (FEATURE_COLUMNS in predictor.py must match)
         feature_columns = ['mood_encoded', 'weather_encoded', 'caffeine_encoded', 
                           'temp_encoded', 'sweetnessLevel', 'intensity', 'vegan']
         X = training_df[feature_columns]
@@ -128,10 +128,44 @@ def test_all_moods():
         else:
             print(f"\n{mood:12} → Error or no recommendations")
 
+def test_local_time_of_day():
+    """Test that the time of day follows the user's location, not UTC"""
+    print("\n" + "="*60)
+    print("TEST 5: Local Time of Day (Cairo, 18:30 UTC = 20:30 local)")
+    print("="*60)
+    
+    data = {
+        "user_id": "user_test789",
+        "email": "test3@example.com",
+        "mood": "Calm",
+        "song": None,
+        "location": {
+            "latitude": 30.0543978,
+            "longitude": 31.453874,
+            "city": "Cairo"
+        },
+        "weather": {
+            "temperature": 22,
+            "condition": "clear"
+        },
+        "timestamp": "2024-01-01T18:30:00Z"
+    }
+    
+    response = requests.post(f"{BASE_URL}/recommend", json=data)
+    print(f"Status Code: {response.status_code}")
+    context = response.json().get('context', {})
+    print(f"Context: {json.dumps(context, indent=2)}")
+    
+    return (
+        response.status_code == 200 and
+        context.get('time_of_day') == 'evening' and
+        context.get('utc_offset') == 2
+    )
+
 def test_stats():
     """Test statistics endpoint"""
     print("\n" + "="*60)
-    print("TEST 5: Model Statistics")
+    print("TEST 6: Model Statistics")
     print("="*60)
     
     response = requests.get(f"{BASE_URL}/stats")
@@ -155,6 +189,30 @@ def test_stats():
     
     return response.status_code == 200
 
+def test_stats_conditional_get():
+    """Test ETag revalidation on the statistics endpoint"""
+    print("\n" + "="*60)
+    print("TEST 7: Statistics Conditional GET")
+    print("="*60)
+    
+    first = requests.get(f"{BASE_URL}/stats")
+    etag = first.headers.get('ETag')
+    print(f"First Status Code: {first.status_code}, ETag: {etag}")
+    
+    second = requests.get(f"{BASE_URL}/stats", headers={"If-None-Match": etag or ""})
+    print(f"Revalidation Status Code: {second.status_code}")
+    
+    # Compressing proxies weaken the tag; it must still revalidate
+    weak = requests.get(f"{BASE_URL}/stats", headers={"If-None-Match": f"W/{etag}"})
+    print(f"Weak Revalidation Status Code: {weak.status_code}")
+    
+    return (
+        first.status_code == 200 and
+        etag is not None and
+        second.status_code == 304 and
+        weak.status_code == 304
+    )
+
 def main():
     """Run all tests"""
     print("\n🧪 STARTING API TESTS")
@@ -165,7 +223,9 @@ def main():
         ("Recommendation with Song", test_recommendation_with_song),
         ("Recommendation without Song", test_recommendation_without_song),
         ("All Moods", test_all_moods),
-        ("Statistics", test_stats)
+        ("Local Time of Day", test_local_time_of_day),
+        ("Statistics", test_stats),
+        ("Statistics Conditional GET", test_stats_conditional_get)
     ]
     
     results = []
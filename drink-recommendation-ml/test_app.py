@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the precomputed /stats and /catalog responses, served through
+Flask's test client: ETag revalidation (strong and weak tags), stale tags,
+and a new ETag once the predictor is reloaded with a changed catalog.
+"""
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+READY_TIMEOUT_S = 30
+
+@pytest.fixture(scope='module')
+def app_module():
+    """Import app from the project directory and wait for startup to finish"""
+    cwd = os.getcwd()
+    os.chdir(Path(__file__).parent)
+    try:
+        import app
+        deadline = time.monotonic() + READY_TIMEOUT_S
+        while app.startup_state['status'] == 'starting' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert app.startup_state['status'] == 'ready', app.startup_state
+        yield app
+    finally:
+        os.chdir(cwd)
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+@pytest.mark.parametrize('path', ['/stats', '/catalog'])
+def test_conditional_get(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.get_json()['success']
+    etag, weak = response.get_etag()
+    assert etag and not weak
+
+    for if_none_match in [f'"{etag}"', f'W/"{etag}"', f'"stale", "{etag}"']:
+        revalidated = client.get(path, headers={'If-None-Match': if_none_match})
+        assert revalidated.status_code == 304, if_none_match
+        assert revalidated.data == b''
+        assert revalidated.get_etag() == (etag, False)
+
+    stale = client.get(path, headers={'If-None-Match': '"stale"'})
+    assert stale.status_code == 200
+    assert stale.data == response.data
+
+def test_stats_and_catalog_have_distinct_etags(client):
+    assert client.get('/stats').get_etag() != client.get('/catalog').get_etag()
+
+def test_etag_changes_after_reload(app_module, client, monkeypatch):
+    """A reloaded catalog gets new payloads, so old tags no longer revalidate"""
+    old_etags = {path: client.get(path).get_etag()[0] for path in ['/stats', '/catalog']}
+
+    changed = app_module.predictor.drinks_df.iloc[1:].reset_index(drop=True)
+    monkeypatch.setattr(pd, 'read_pickle', lambda path: changed)
+    monkeypatch.setattr(app_module, 'predictor', app_module.load_predictor())
+
+    for path, old_etag in old_etags.items():
+        response = client.get(path, headers={'If-None-Match': f'"{old_etag}"'})
+        assert response.status_code == 200, path
+        assert response.get_etag()[0] != old_etag
+        assert response.get_json()['total_drinks'] == len(changed)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline geo lookup: known cities resolve to their standard-time
+UTC offset (and climate, where given), and the region table stays ordered so
+smaller boxes win over the larger ones they overlap.
+"""
+import json
+
+import pytest
+
+from model.geo import REGIONS_FILE, resolve_location
+
+# name, latitude, longitude, utc_offset, climate (None = not checked).
+# Border towns and islands are here on purpose: they are where overlapping
+# boxes disagree.
+CITIES = [
+    ('Cairo', 30.0444, 31.2357, 2, 'arid'),
+    ('Alexandria', 31.2001, 29.9187, 2, 'arid'),
+    ('Sharm El Sheikh', 27.9158, 34.3299, 2, 'arid'),
+    ('Taba', 29.4925, 34.8969, 2, None),
+    ('Halaib', 22.22, 36.64, 2, 'arid'),
+    ('Tabuk', 28.3835, 36.5662, 3, 'arid'),
+    ('Al Wajh', 26.2456, 36.4525, 3, 'arid'),
+    ('Jeddah', 21.4858, 39.1925, 3, 'arid'),
+    ('Riyadh', 24.7136, 46.6753, 3, 'arid'),
+    ('Aqaba', 29.5321, 35.0063, 3, 'arid'),
+    ('Amman', 31.9539, 35.9106, 3, 'arid'),
+    ('Eilat', 29.5577, 34.9519, 2, 'arid'),
+    ('Tel Aviv', 32.0853, 34.7818, 2, None),
+    ('Beirut', 33.8938, 35.5018, 2, 'temperate'),
+    ('Damascus', 33.5138, 36.2765, 3, 'arid'),
+    ('Baghdad', 33.3152, 44.3661, 3, 'arid'),
+    ('Basra', 30.5085, 47.7804, 3, 'arid'),
+    ('Kermanshah', 34.3142, 47.065, 3.5, 'arid'),
+    ('Abadan', 30.3392, 48.3043, 3.5, 'arid'),
+    ('Tehran', 35.6892, 51.389, 3.5, 'arid'),
+    ('Dubai', 25.2048, 55.2708, 4, 'arid'),
+    ('Doha', 25.2854, 51.531, 3, 'arid'),
+    ('Muscat', 23.588, 58.3829, 4, 'arid'),
+    ('Kuwait City', 29.3759, 47.9774, 3, 'arid'),
+    ('Istanbul', 41.0082, 28.9784, 3, 'temperate'),
+    ('Izmir', 38.4237, 27.1428, 3, 'temperate'),
+    ('Bodrum', 37.0344, 27.4305, 3, 'temperate'),
+    ('Rhodes', 36.4341, 28.2176, 2, 'temperate'),
+    ('Lesbos', 39.1, 26.3, 2, 'temperate'),
+    ('Athens', 37.9838, 23.7275, 2, 'temperate'),
+    ('Khartoum', 15.5007, 32.5599, 2, 'arid'),
+    ('Addis Ababa', 8.9806, 38.7578, 3, 'tropical'),
+    ('Nairobi', -1.2921, 36.8219, 3, 'tropical'),
+    ('Lagos', 6.5244, 3.3792, 1, 'tropical'),
+    ('Casablanca', 33.5731, -7.5898, 1, 'arid'),
+    ('Tunis', 36.8065, 10.1815, 1, 'arid'),
+    ('Johannesburg', -26.2041, 28.0473, 2, 'temperate'),
+    ('London', 51.5074, -0.1278, 0, 'temperate'),
+    ('Dublin', 53.3498, -6.2603, 0, 'temperate'),
+    ('Lisbon', 38.7223, -9.1393, 0, 'temperate'),
+    ('Paris', 48.8566, 2.3522, 1, 'temperate'),
+    ('Berlin', 52.52, 13.405, 1, 'temperate'),
+    ('Madrid', 40.4168, -3.7038, 1, 'temperate'),
+    ('Rome', 41.9028, 12.4964, 1, 'temperate'),
+    ('Stockholm', 59.3293, 18.0686, 1, 'continental'),
+    ('Helsinki', 60.1699, 24.9384, 2, 'continental'),
+    ('Kyiv', 50.4501, 30.5234, 2, 'continental'),
+    ('Moscow', 55.7558, 37.6173, 3, 'continental'),
+    ('Karachi', 24.8607, 67.0011, 5, 'arid'),
+    ('Lahore', 31.5204, 74.3587, 5, 'arid'),
+    ('Delhi', 28.6139, 77.209, 5.5, 'tropical'),
+    ('Mumbai', 19.076, 72.8777, 5.5, 'tropical'),
+    ('Kolkata', 22.5726, 88.3639, 5.5, 'tropical'),
+    ('Guwahati', 26.1445, 91.7362, 5.5, 'tropical'),
+    ('Kathmandu', 27.7172, 85.324, 5.75, 'temperate'),
+    ('Dhaka', 23.8103, 90.4125, 6, 'tropical'),
+    ('Thimphu', 27.4728, 89.639, 6, 'temperate'),
+    ('Lhasa', 29.652, 91.1721, 8, 'temperate'),
+    ('Beijing', 39.9042, 116.4074, 8, 'temperate'),
+    ('Shanghai', 31.2304, 121.4737, 8, 'temperate'),
+    ('Seoul', 37.5665, 126.978, 9, 'temperate'),
+    ('Tokyo', 35.6762, 139.6503, 9, 'temperate'),
+    ('Bangkok', 13.7563, 100.5018, 7, 'tropical'),
+    ('Hat Yai', 7.0086, 100.4747, 7, 'tropical'),
+    ('Kuala Lumpur', 3.139, 101.6869, 8, 'tropical'),
+    ('Singapore', 1.3521, 103.8198, 8, 'tropical'),
+    ('Jakarta', -6.2088, 106.8456, 7, 'tropical'),
+    ('Manila', 14.5995, 120.9842, 8, 'tropical'),
+    ('Sydney', -33.8688, 151.2093, 10, 'temperate'),
+    ('Perth', -31.9505, 115.8605, 8, 'arid'),
+    ('Adelaide', -34.9285, 138.6007, 9.5, 'arid'),
+    ('Auckland', -36.8485, 174.7633, 12, 'temperate'),
+    ('New York', 40.7128, -74.006, -5, 'temperate'),
+    ('Chicago', 41.8781, -87.6298, -6, 'continental'),
+    ('Denver', 39.7392, -104.9903, -7, 'arid'),
+    ('Los Angeles', 34.0522, -118.2437, -8, 'temperate'),
+    ('Mexico City', 19.4326, -99.1332, -6, 'arid'),
+    ('Honolulu', 21.3069, -157.8583, -10, 'tropical'),
+    ('Anchorage', 61.2181, -149.9003, -9, 'polar'),
+    ('Sao Paulo', -23.5505, -46.6333, -3, 'tropical'),
+    ('Buenos Aires', -34.6037, -58.3816, -3, 'temperate'),
+    ('Santiago', -33.4489, -70.6693, -4, 'temperate'),
+    ('Lima', -12.0464, -77.0428, -5, 'tropical'),
+    ('Bogota', 4.711, -74.0721, -5, 'tropical'),
+    ('Edirne', 41.6771, 26.5557, 3, None),
+    ('Tirana', 41.3275, 19.8187, 1, None),
+    ('Corfu', 39.6243, 19.9217, 2, None),
+    ('Riga', 56.9496, 24.1052, 2, None),
+    ('Tallinn', 59.437, 24.7536, 2, None),
+    ('Minsk', 53.9006, 27.559, 3, None),
+    ('Oulu', 65.0121, 25.4651, 2, None),
+    ('Lulea', 65.5848, 22.1547, 1, None),
+    ('Rostov-on-Don', 47.2357, 39.7015, 3, None),
+    ('Almaty', 43.222, 76.8512, 5, None),
+    ('Tashkent', 41.2995, 69.2401, 5, None),
+    ('Kashgar', 39.4677, 75.9898, 8, None),
+    ('Yerevan', 40.1792, 44.4991, 4, None),
+    ('Tabriz', 38.08, 46.2919, 3.5, None),
+    ('Dammam', 26.4207, 50.0888, 3, None),
+    ('Manama', 26.2285, 50.586, 3, None),
+    ('Shimla', 31.1048, 77.1734, 5.5, None),
+    ('Srinagar', 34.0837, 74.7973, 5.5, None),
+    ('Islamabad', 33.6844, 73.0479, 5, None),
+    ('Gangtok', 27.3314, 88.6138, 5.5, None),
+    ('Gorakhpur', 26.7606, 83.3732, 5.5, None),
+    ('Chittagong', 22.3569, 91.7832, 6, None),
+    ('Shigatse', 29.269, 88.88, 8, None),
+    ('Kampala', 0.3476, 32.5825, 3, None),
+    ('Tripoli', 32.8872, 13.1913, 2, None),
+    ('Algiers', 36.7538, 3.0588, 1, None),
+    ('Tijuana', 32.5149, -117.0382, -8, None),
+    ('Monterrey', 25.6866, -100.3161, -6, None),
+    ('La Paz', -16.4897, -68.1193, -4, None),
+    ('Mendoza', -32.8895, -68.8458, -3, None),
+    ('Arica', -18.4783, -70.3126, -4, None),
+    ('Tacna', -18.0146, -70.2536, -5, None),
+    ('Caracas', 10.4806, -66.9036, -4, None),
+    ('Hanoi', 21.0278, 105.8342, 7, None),
+    ('Nanning', 22.817, 108.3665, 8, None),
+    ('Medan', 3.5952, 98.6722, 7, None),
+    ('Kota Kinabalu', 5.9804, 116.0735, 8, None),
+    ('Badajoz', 38.8794, -6.9707, 1, None),
+    ('Porto', 41.1579, -8.6291, 0, None),
+    ('Kabul', 34.5553, 69.2075, 4.5, None),
+    ('Kandahar', 31.6289, 65.7372, 4.5, None),
+    ('Herat', 34.3529, 62.204, 4.5, None),
+    ('Quetta', 30.1798, 66.975, 5, None),
+    ('Peshawar', 34.0151, 71.5249, 5, None),
+    ('Mashhad', 36.2605, 59.6168, 3.5, None),
+    ('Dushanbe', 38.5598, 68.787, 5, None),
+    ('Vladivostok', 43.1198, 131.8869, 10, None),
+    ('Khabarovsk', 48.4802, 135.0719, 10, None),
+    ('Harbin', 45.8038, 126.535, 8, None),
+    ('Sapporo', 43.0618, 141.3545, 9, None),
+    ('Omsk', 54.9885, 73.3242, 6, None),
+    ('Bishkek', 42.8746, 74.5698, 6, None),
+    ('Osh', 40.5283, 72.7985, 6, None),
+    ('Andijan', 40.7821, 72.3442, 5, None),
+    ('Pavlodar', 52.2873, 76.9674, 5, None),
+    ('Semey', 50.4111, 80.2275, 5, None),
+    ('Yekaterinburg', 56.8389, 60.6057, 5, None),
+    ('Ufa', 54.7388, 55.9721, 5, None),
+    ('Novosibirsk', 55.0084, 82.9357, 7, None),
+    ('Krasnoyarsk', 56.0153, 92.8932, 7, None),
+    ('Irkutsk', 52.287, 104.305, 8, None),
+    ('Ulaanbaatar', 47.8864, 106.9057, 8, None),
+    ('Chita', 52.034, 113.4994, 9, None),
+    ('Yakutsk', 62.0355, 129.6755, 9, None),
+    ('Yuzhno-Sakhalinsk', 46.9591, 142.738, 11, None),
+    ('Magadan', 59.5612, 150.8301, 11, None),
+    ('Petropavlovsk-Kamchatsky', 53.0452, 158.6483, 12, None),
+    ('Dakar', 14.7167, -17.4677, 0, None),
+    ('Bamako', 12.6392, -8.0029, 0, None),
+    ('Abidjan', 5.36, -4.0083, 0, None),
+    ('Accra', 5.6037, -0.187, 0, None),
+    ('Niamey', 13.5116, 2.1254, 1, None),
+    ('Lagos', 6.5244, 3.3792, 1, None),
+    ('Las Palmas', 28.1235, -15.4363, 0, None),
+    ('Ust-Kamenogorsk', 49.9483, 82.6279, 5, None),
+    ('Urumqi', 43.8256, 87.6168, 8, None),
+    ('Cotonou', 6.3703, 2.3912, 1, None),
+    ('Lome', 6.1725, 1.2314, 0, None),
+    ("N'Djamena", 12.1348, 15.0557, 1, None),
+    ('Ouagadougou', 12.3714, -1.5197, 0, None),
+]
+
+def box_area(region):
+    south, west, north, east = region['bounds']
+    return (north - south) * (east - west)
+
+@pytest.mark.parametrize('name, latitude, longitude, utc_offset, climate', CITIES)
+def test_known_city(name, latitude, longitude, utc_offset, climate):
+    geo = resolve_location({'latitude': latitude, 'longitude': longitude})
+    assert geo.utc_offset == utc_offset, (name, geo)
+    if climate is not None:
+        assert geo.climate == climate, (name, geo)
+
+def test_regions_are_smallest_first():
+    with open(REGIONS_FILE, encoding='utf-8') as f:
+        regions = json.load(f)
+    areas = [box_area(region) for region in regions]
+    assert areas == sorted(areas)
+
+@pytest.mark.parametrize('location', [
+    None,
+    {},
+    {'latitude': 'north', 'longitude': 0},
+    {'latitude': 91, 'longitude': 0},
+])
+def test_unusable_location(location):
+    assert resolve_location(location) is None
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for context extraction: timestamps are moved to the local time of the
+request's coordinates, and weather buckets shift with the local climate.
+"""
+from datetime import timedelta
+
+import pytest
+
+from model.scoring import build_context, get_time_of_day, local_datetime, map_weather_condition
+
+CAIRO = {'latitude': 30.0444, 'longitude': 31.2357}
+KABUL = {'latitude': 34.5553, 'longitude': 69.2075}
+
+def context_for(timestamp, location=None, temperature=20):
+    return build_context({
+        'mood': 'Happy',
+        'weather': {'temperature': temperature, 'condition': 'clear'},
+        'timestamp': timestamp,
+        'location': location
+    })
+
+def test_utc_timestamp_moves_to_local_time():
+    """16:00Z is 18:00 in Cairo (UTC+2)"""
+    context = context_for('2024-01-01T16:00:00Z', CAIRO)
+    assert context['utc_offset'] == 2
+    assert context['time_of_day'] == 'evening'
+
+def test_half_hour_offset():
+    """12:45Z is 17:15 in Kabul (UTC+4:30)"""
+    assert local_datetime('2024-01-01T12:45:00Z', 4.5).strftime('%H:%M') == '17:15'
+    assert context_for('2024-01-01T12:45:00Z', KABUL)['time_of_day'] == 'evening'
+
+def test_timestamp_with_offset_is_left_alone():
+    """A non-UTC offset is already the client's local time"""
+    local = local_datetime('2024-01-01T12:30:00+03:00', 2)
+    assert local.hour == 12
+    assert local.utcoffset() == timedelta(hours=3)
+    assert context_for('2024-01-01T12:30:00+03:00', CAIRO)['time_of_day'] == 'afternoon'
+
+def test_naive_timestamp_is_taken_as_utc():
+    local = local_datetime('2024-01-01T16:00:00', 2)
+    assert local.hour == 18
+    assert local.utcoffset() == timedelta(hours=2)
+    assert context_for('2024-01-01T16:00:00', CAIRO)['time_of_day'] == 'evening'
+
+@pytest.mark.parametrize('location', [
+    None,
+    {},
+    {'city': 'Cairo'},
+    {'latitude': 'north', 'longitude': 31.2},
+    {'latitude': 130, 'longitude': 31.2},
+])
+def test_without_usable_location_time_stays_utc(location):
+    context = context_for('2024-01-01T16:00:00Z', location)
+    assert context['utc_offset'] is None
+    assert context['climate'] is None
+    assert context['time_of_day'] == 'afternoon'
+    assert get_time_of_day('2024-01-01T16:00:00Z') == 'afternoon'
+
+def test_unparseable_timestamp_defaults_to_afternoon():
+    assert get_time_of_day('', 2) == 'afternoon'
+    assert get_time_of_day('yesterday', 2) == 'afternoon'
+
+@pytest.mark.parametrize('temperature, climate, expected', [
+    (27, None, 'hot'),
+    (27, 'temperate', 'hot'),
+    (27, 'arid', 'warm'),
+    (27, 'tropical', 'warm'),
+    (28, 'arid', 'hot'),
+    (22, 'continental', 'hot'),
+    (8, 'continental', 'cool'),
+    (9, 'temperate', 'cold'),
+    (20, 'polar', 'hot'),
+    (5, 'polar', 'cool'),
+    (4, 'polar', 'cold'),
+])
+def test_climate_shifts_weather_buckets(temperature, climate, expected):
+    assert map_weather_condition('clear', temperature, climate) == expected
+
+def test_context_uses_local_climate():
+    """27°C in Cairo (arid) is only warm, but still calls for a cold drink"""
+    context = context_for('2024-01-01T16:00:00Z', CAIRO, temperature=27)
+    assert context['climate'] == 'arid'
+    assert context['weather'] == 'warm'
+    assert context['preferred_temp'] == 'cold'
+
+    assert context_for('2024-01-01T16:00:00Z', temperature=27)['weather'] == 'hot'
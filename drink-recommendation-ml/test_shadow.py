@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for shadow scoring: the bounded pool drops work when saturated, and a
+shadow predictor ranks with its own trained model rather than echoing the
+primary's rules.
+"""
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from model.predictor import DrinkPredictor
+from model.shadow import ShadowScorer, rank_overlap
+from model.train_model import DrinkRecommendationModel
+
+MODEL_PATH = Path(__file__).parent / 'model'
+
+PRIMARY_RESULT = {
+    'success': True,
+    'recommendations': [{'name': 'Americano'}, {'name': 'Cappuccino'}]
+}
+
+class BlockingPredictor:
+    """Stands in for a slow shadow model: predict waits until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def predict(self, user_data):
+        self.release.wait(5)
+        return {'success': True, 'recommendations': [{'name': 'Americano'}]}
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+def test_saturated_pool_drops_samples():
+    """Once running + waiting slots are full, submit drops instead of queueing"""
+    predictor = BlockingPredictor()
+    scorer = ShadowScorer(predictor, sample_rate=1.0, max_workers=1, max_pending=2)
+    try:
+        accepted = [scorer.submit({'mood': 'Happy'}, PRIMARY_RESULT, 1.0) for _ in range(5)]
+        assert accepted == [True, True, False, False, False]
+        assert scorer.stats()['sampled'] == 2
+        assert scorer.stats()['dropped'] == 3
+
+        predictor.release.set()
+        wait_for(lambda: scorer.stats()['completed'] == 2)
+
+        # Slots are released once the backlog drains
+        assert scorer.submit({'mood': 'Happy'}, PRIMARY_RESULT, 1.0)
+        wait_for(lambda: scorer.stats()['completed'] == 3)
+        stats = scorer.stats()
+        assert stats['dropped'] == 3
+        assert stats['mean_rank_overlap'] == 0.5
+        assert stats['top1_match_rate'] == 1.0
+    finally:
+        scorer.shutdown()
+
+def test_unsampled_requests_are_skipped():
+    scorer = ShadowScorer(BlockingPredictor(), sample_rate=0.0)
+    try:
+        assert not scorer.submit({'mood': 'Happy'}, PRIMARY_RESULT, 1.0)
+        assert scorer.stats()['sampled'] == 0
+        assert scorer.stats()['dropped'] == 0
+    finally:
+        scorer.shutdown()
+
+@pytest.fixture(scope='module')
+def primary():
+    return DrinkPredictor(model_path=MODEL_PATH)
+
+@pytest.fixture(scope='module')
+def shadow_model_path(primary, tmp_path_factory):
+    """A candidate model trained on the bundled catalog"""
+    path = tmp_path_factory.mktemp('shadow_model')
+    model = DrinkRecommendationModel()
+    assert model.train(drinks=primary.drinks_df.to_dict('records'))
+    model.save_model(path)
+    return path
+
+def test_shadow_ranking_depends_on_its_model(primary, shadow_model_path):
+    """Re-ranking with the trained model must be able to disagree with the rules"""
+    shadow = DrinkPredictor(model_path=shadow_model_path, drinks_df=primary.drinks_df, model_rerank=True)
+    shadow.load_artifacts()
+
+    overlaps = []
+    for mood in ['Happy', 'Calm', 'Energetic', 'Tired', 'Romantic', 'Focused']:
+        for temperature in [5, 30]:
+            user_data = {'mood': mood, 'weather': {'temperature': temperature}}
+            primary_result = primary.predict(user_data)
+            shadow_result = shadow.predict(user_data)
+            assert shadow_result['success']
+            assert len(shadow_result['recommendations']) == len(primary_result['recommendations'])
+            overlaps.append(rank_overlap(primary_result['recommendations'], shadow_result['recommendations']))
+
+    assert min(overlaps) < 1.0
+
+def test_missing_shadow_artifacts_fail_to_load(primary, tmp_path):
+    shadow = DrinkPredictor(model_path=tmp_path, drinks_df=primary.drinks_df, model_rerank=True)
+    with pytest.raises(FileNotFoundError):
+        shadow.load_artifacts()
+
+def test_rerank_lookups_are_built_once(primary, shadow_model_path):
+    """Encoder lookups load lazily with the artifacts, not on every request"""
+    shadow = DrinkPredictor(model_path=shadow_model_path, drinks_df=primary.drinks_df, model_rerank=True)
+    assert 'encoder_codes' not in shadow.__dict__
+
+    user_data = {'mood': 'Happy', 'weather': {'temperature': 30}}
+    assert shadow.predict(user_data)['success']
+    codes = shadow.encoder_codes
+    assert shadow.predict(user_data)['success']
+    assert shadow.encoder_codes is codes
+
+    labels = shadow.label_encoder.classes_
+    assert codes['label'] == {label: i for i, label in enumerate(labels)}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharded catalog: scatter-gather results must match in-process
+scoring, catalog syncs rebuild only changed shards, and slow or dead shards
+are reported and recovered.
+"""
+import itertools
+import os
+import signal
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from model.predictor import DrinkPredictor
+from model.scoring import build_context
+from model.sharding import ShardedCatalog, shard_for
+
+MODEL_PATH = Path(__file__).parent / 'model'
+
+NUM_SHARDS = 3
+
+CONTEXTS = [
+    build_context({
+        'mood': mood,
+        'song': song,
+        'weather': {'temperature': temperature, 'condition': 'clear'},
+        'timestamp': timestamp
+    })
+    for mood, song, temperature, timestamp in itertools.product(
+        ['Happy', 'Calm', 'Energetic', 'Tired', 'Romantic', 'Focused'],
+        [None, 'Pump It Up'],
+        [5, 15, 22, 32],
+        ['2024-01-01T08:00:00Z', '2024-01-01T19:00:00Z']
+    )
+]
+
+@pytest.fixture(scope='module')
+def predictor():
+    return DrinkPredictor(model_path=MODEL_PATH)
+
+@pytest.fixture
+def catalog(predictor):
+    catalog = ShardedCatalog(predictor.drinks_df, NUM_SHARDS, timeout=2.0)
+    yield catalog
+    catalog.close()
+
+def test_sharded_top_k_matches_in_process(predictor, catalog):
+    """Merged shard results are identical to single-process ranking"""
+    for context in CONTEXTS:
+        recommendations, missing = catalog.top_k(context, 5)
+        assert missing == []
+        assert recommendations == predictor._top_k(context, 5), context
+
+def test_sync_rebuilds_only_changed_shards(predictor, catalog):
+    """Only the shard holding an edited drink is rebuilt"""
+    assert catalog.sync(predictor.drinks_df) == []
+
+    changed = predictor.drinks_df.copy()
+    changed.at[changed.index[0], 'intensity'] = 1
+    expected = shard_for(changed.iloc[0]['name'], NUM_SHARDS)
+
+    assert catalog.sync(changed) == [expected]
+    assert catalog.sync(changed) == []
+
+def test_sync_insert_or_delete_rebuilds_one_shard(predictor, catalog):
+    """Shifting catalog positions doesn't rebuild shards whose drinks are unchanged"""
+    df = predictor.drinks_df
+    middle = len(df) // 2
+
+    added = df.iloc[middle].copy()
+    added['name'] = 'Sync Test Latte'
+    inserted = pd.concat([df.iloc[:middle], added.to_frame().T, df.iloc[middle:]], ignore_index=True)
+    deleted = df.drop(df.index[middle]).reset_index(drop=True)
+
+    for changed, name in [(inserted, added['name']), (deleted, df.iloc[middle]['name'])]:
+        assert catalog.sync(changed) == [shard_for(name, NUM_SHARDS)]
+
+        # Repositioned shards must still break ties by the new positions
+        expected = DrinkPredictor(model_path=MODEL_PATH, drinks_df=changed)
+        for context in CONTEXTS[:24]:
+            assert catalog.top_k(context, 5)[0] == expected._top_k(context, 5), context
+
+        assert catalog.sync(df) == [shard_for(name, NUM_SHARDS)]
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGSTOP'), reason='needs SIGSTOP')
+def test_timed_out_shard_is_missing(predictor):
+    """A stalled shard misses the deadline; the others still answer"""
+    catalog = ShardedCatalog(predictor.drinks_df, NUM_SHARDS, timeout=0.2)
+    stalled = catalog.shards[1]
+    try:
+        catalog.top_k(CONTEXTS[0], 5)
+        os.kill(stalled._process.pid, signal.SIGSTOP)
+
+        recommendations, missing = catalog.top_k(CONTEXTS[0], 5)
+        assert missing == [stalled.shard_id]
+        assert recommendations
+        assert all(rec['name'] not in {d['name'] for _, d in stalled.records} for rec in recommendations)
+    finally:
+        os.kill(stalled._process.pid, signal.SIGCONT)
+        catalog.close()
+
+def test_dead_shard_is_restarted(predictor, catalog):
+    """A worker that exits is restarted on the next query"""
+    dead = catalog.shards[0]
+    # Repeat so the old reader's EOF lands on both sides of the restart; it
+    # must never fail a query sent to the new worker
+    for _ in range(10):
+        dead._process.kill()
+        dead._process.join()
+
+        recommendations, missing = catalog.top_k(CONTEXTS[0], 5)
+        assert missing == []
+        assert dead.alive
+        assert recommendations == predictor._top_k(CONTEXTS[0], 5)
+
+def test_sync_survives_a_closed_pipe(predictor, catalog):
+    """A pipe closed between the liveness check and the send restarts the worker"""
+    changed = predictor.drinks_df.copy()
+    changed.at[changed.index[0], 'intensity'] = 1
+    shard = catalog.shards[shard_for(changed.iloc[0]['name'], NUM_SHARDS)]
+
+    conn, _ = shard._channel
+    conn.close()
+    assert shard.alive
+
+    assert catalog.sync(changed) == [shard.shard_id]
+    expected = DrinkPredictor(model_path=MODEL_PATH, drinks_df=changed)
+    recommendations, missing = catalog.top_k(CONTEXTS[0], 5)
+    assert missing == []
+    assert recommendations == expected._top_k(CONTEXTS[0], 5)
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGSTOP'), reason='needs SIGSTOP')
+def test_all_shards_missing_falls_back_to_in_process():
+    """With every shard stalled, predict scores in-process instead of returning nothing"""
+    sharded = DrinkPredictor(model_path=MODEL_PATH, shards=2, shard_timeout=0.1)
+    local = DrinkPredictor(model_path=MODEL_PATH, drinks_df=sharded.drinks_df)
+    user_data = {'mood': 'Happy', 'weather': {'temperature': 15}}
+    pids = [shard._process.pid for shard in sharded.catalog.shards]
+    try:
+        for pid in pids:
+            os.kill(pid, signal.SIGSTOP)
+
+        result = sharded.predict(user_data)
+        assert result['success']
+        assert result['missing_shards'] == [0, 1]
+        assert not result['partial']
+        assert result['recommendations'] == local.predict(user_data)['recommendations']
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGCONT)
+        sharded.catalog.close()
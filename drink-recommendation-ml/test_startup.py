@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Startup budget checks for the Drink Recommendation ML API.
+Imports app.py in a fresh interpreter and checks import time, lazy imports,
+readiness gating and first-request latency against fixed budgets.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Budgets; raise them deliberately, never to paper over a regression.
+# import app costs ~130 ms (Flask); pulling pandas in eagerly adds ~300 ms
+IMPORT_BUDGET_MS = 300
+READY_TIMEOUT_S = 30
+FIRST_REQUEST_BUDGET_MS = 250
+
+# Modules only /retrain should ever pull in
+TRAINING_ONLY_MODULES = ['sklearn', 'requests', 'model.train_model']
+
+# Modules the background startup thread loads; import app must not
+DEFERRED_MODULES = ['pandas', 'model.predictor']
+
+# Cold import, wait for readiness, then time the first request. Imports are
+# recorded per thread: the startup thread begins loading pandas as soon as
+# import app returns, so sys.modules alone can't tell who pulled it in.
+BUDGET_PROBE = f"""
+import importlib.abc, json, sys, threading, time
+
+imported_by_app = []
+class RecordMainThreadImports(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        if threading.current_thread() is threading.main_thread():
+            imported_by_app.append(name)
+        return None
+
+sys.meta_path.insert(0, RecordMainThreadImports())
+start = time.perf_counter()
+import app
+import_ms = (time.perf_counter() - start) * 1000
+sys.meta_path.pop(0)
+
+client = app.app.test_client()
+deadline = time.monotonic() + {READY_TIMEOUT_S}
+while client.get('/readyz').status_code != 200:
+    if app.startup_state['status'] == 'failed' or time.monotonic() > deadline:
+        break
+    time.sleep(0.05)
+
+start = time.perf_counter()
+response = client.post('/recommend', json={{
+    'mood': 'Happy',
+    'weather': {{'temperature': 15, 'condition': 'cloudy'}},
+    'timestamp': '2024-01-01T18:00:00Z'
+}})
+first_request_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({{
+    'import_ms': import_ms,
+    'deferred_imported_by_app': [m for m in {DEFERRED_MODULES!r} if m in imported_by_app],
+    'startup': app.startup_state,
+    'first_request_status': response.status_code,
+    'first_request_ms': first_request_ms,
+    'loaded_training_modules': [m for m in {TRAINING_ONLY_MODULES!r} if m in sys.modules]
+}}))
+"""
+
+# Hold warm-up on an event so the not-ready window is observed, not raced
+GATING_PROBE = f"""
+import json, threading, time
+from model.predictor import DrinkPredictor
+
+release = threading.Event()
+warm_up = DrinkPredictor.warm_up
+def held_warm_up(self):
+    release.wait({READY_TIMEOUT_S})
+    warm_up(self)
+DrinkPredictor.warm_up = held_warm_up
+
+import app
+client = app.app.test_client()
+before = {{
+    'livez': client.get('/livez').status_code,
+    'readyz': client.get('/readyz').status_code,
+    'recommend': client.post('/recommend', json={{'mood': 'Happy'}}).status_code,
+    'status': client.get('/').get_json()['status']
+}}
+
+release.set()
+deadline = time.monotonic() + {READY_TIMEOUT_S}
+while app.startup_state['status'] == 'starting' and time.monotonic() < deadline:
+    time.sleep(0.05)
+
+after = {{
+    'readyz': client.get('/readyz').status_code,
+    'recommend': client.post('/recommend', json={{'mood': 'Happy'}}).status_code,
+    'status': client.get('/').get_json()['status']
+}}
+print(json.dumps({{'before': before, 'after': after}}))
+"""
+
+_probe_results = {}
+
+def run_probe(probe):
+    """Run a startup probe once in a clean interpreter"""
+    if probe not in _probe_results:
+        output = subprocess.run(
+            [sys.executable, '-c', probe],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        _probe_results[probe] = json.loads(output.strip().splitlines()[-1])
+    return _probe_results[probe]
+
+def test_import_time():
+    """app.py must import within budget (model loading happens after import)"""
+    print("\n" + "="*60)
+    print("TEST 1: Import Time")
+    print("="*60)
+
+    result = run_probe(BUDGET_PROBE)
+    print(f"Import: {result['import_ms']:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    assert result['import_ms'] <= IMPORT_BUDGET_MS
+
+def test_import_defers_model_modules():
+    """import app must leave pandas and the predictor to the startup thread"""
+    print("\n" + "="*60)
+    print("TEST 2: Model Modules Load After Import")
+    print("="*60)
+
+    imported = run_probe(BUDGET_PROBE)['deferred_imported_by_app']
+    print(f"Imported by app: {imported or 'none'}")
+    assert not imported
+
+def test_readiness():
+    """Traffic is refused until warm-up finishes, then readiness flips"""
+    print("\n" + "="*60)
+    print("TEST 3: Readiness Gating")
+    print("="*60)
+
+    result = run_probe(GATING_PROBE)
+    print(f"Before warm-up: {result['before']}")
+    print(f"After warm-up: {result['after']}")
+    assert result['before'] == {'livez': 200, 'readyz': 503, 'recommend': 503, 'status': 'starting'}
+    assert result['after'] == {'readyz': 200, 'recommend': 200, 'status': 'ready'}
+
+def test_first_request_latency():
+    """The first request after readiness must already be warm"""
+    print("\n" + "="*60)
+    print("TEST 4: First Request Latency")
+    print("="*60)
+
+    result = run_probe(BUDGET_PROBE)
+    print(f"Status Code: {result['first_request_status']}")
+    print(f"First request: {result['first_request_ms']:.1f} ms (budget {FIRST_REQUEST_BUDGET_MS} ms)")
+    assert result['startup']['status'] == 'ready', result['startup']
+    assert result['first_request_status'] == 200
+    assert result['first_request_ms'] <= FIRST_REQUEST_BUDGET_MS
+
+def test_no_training_imports():
+    """Serving must not import training-only modules"""
+    print("\n" + "="*60)
+    print("TEST 5: Training-only Modules Stay Unloaded")
+    print("="*60)
+
+    loaded = run_probe(BUDGET_PROBE)['loaded_training_modules']
+    print(f"Loaded: {loaded or 'none'}")
+    assert not loaded
+
+def main():
+    """Run all tests"""
+    print("\n🧪 STARTING STARTUP BUDGET TESTS")
+    print("="*60)
+
+    tests = [
+        ("Import Time", test_import_time),
+        ("Deferred Model Imports", test_import_defers_model_modules),
+        ("Readiness Gating", test_readiness),
+        ("First Request Latency", test_first_request_latency),
+        ("No Training Imports", test_no_training_imports)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except AssertionError:
+            results.append((test_name, False))
+        except Exception as e:
+            print(f"\n❌ ERROR in {test_name}: {e}")
+            results.append((test_name, False))
+
+    # Print summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    for test_name, success in results:
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} - {test_name}")
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+    print(f"\n{passed}/{total} tests passed")
+    print("="*60 + "\n")
+
+    sys.exit(0 if passed == total else 1)
+
+if __name__ == "__main__":
+    main()